@@ -1,19 +1,282 @@
 import cv2
 import os
 import json
+import shutil
+import subprocess
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
+import scipy.fft
+import matplotlib
+matplotlib.use("Agg")  # Frames are rendered off-screen, also inside the worker processes
 import matplotlib.pyplot as plt
-from pde import PDE, FieldCollection, ScalarField, CartesianGrid, MemoryStorage
+from numba import boolean, cuda, from_dtype, get_num_threads, njit, prange
 import logging
-from multiprocessing import Pool, cpu_count
-
-def setup_logging(render_dir):
-    """Set up logging to file."""
+from logging.handlers import QueueHandler, QueueListener
+import multiprocessing
+from multiprocessing import cpu_count
+
+@njit(parallel=True, fastmath=True, cache=True)
+def _step(u, v, u_new, v_new, a, b, d0, d1, dx2_inv, dt, periodic):
+    """Advance the Brusselator by one explicit Euler step.
+
+    Uses a 5-point Laplacian. Periodic grids wrap around, otherwise the edges
+    are reflective (zero flux).
+    """
+    n, m = u.shape
+    for i in prange(n):
+        if periodic:
+            i_up = i - 1 if i > 0 else n - 1
+            i_down = i + 1 if i < n - 1 else 0
+        else:
+            i_up = i - 1 if i > 0 else 0
+            i_down = i + 1 if i < n - 1 else n - 1
+        for j in range(m):
+            if periodic:
+                j_left = j - 1 if j > 0 else m - 1
+                j_right = j + 1 if j < m - 1 else 0
+            else:
+                j_left = j - 1 if j > 0 else 0
+                j_right = j + 1 if j < m - 1 else m - 1
+
+            u_c = u[i, j]
+            v_c = v[i, j]
+            # Written without integer literals so float32 grids are not promoted to float64
+            lap_u = ((u[i_down, j] - u_c) + (u[i_up, j] - u_c) + (u[i, j_right] - u_c) + (u[i, j_left] - u_c)) * dx2_inv
+            lap_v = ((v[i_down, j] - v_c) + (v[i_up, j] - v_c) + (v[i, j_right] - v_c) + (v[i, j_left] - v_c)) * dx2_inv
+            uuv = u_c * u_c * v_c
+
+            u_new[i, j] = u_c + dt * (d0 * lap_u + a - b * u_c - u_c + uuv)
+            v_new[i, j] = v_c + dt * (d1 * lap_v + b * u_c - uuv)
+
+@njit(parallel=True, fastmath={"nsz", "arcp", "contract", "afn", "reassoc"}, cache=True)
+def _stats(a):
+    """Return min, max, mean and standard deviation of `a` in a single pass.
+
+    The fast-math flags leave out 'nnan' and 'ninf', so a NaN or inf in the
+    input still turns the mean into a non-finite value.
+    """
+    flat = a.ravel()
+    minimum = np.inf
+    maximum = -np.inf
+    total = 0.0
+    total_squared = 0.0
+    for i in prange(flat.size):
+        x = float(flat[i])
+        minimum = min(minimum, x)
+        maximum = max(maximum, x)
+        total += x
+        total_squared += x * x
+
+    mean = total / flat.size
+    return minimum, maximum, mean, np.sqrt(max(total_squared / flat.size - mean * mean, 0.0))
+
+def warm_up_kernels(dtype, debug=False):
+    """Compile the CPU stepper for `dtype` in the main process.
+
+    With cache=True the machine code is written to Numba's on-disk cache, so
+    the pool workers load it instead of each compiling `_step` on their first
+    call. Compiling from a signature does not start Numba's thread pool. The
+    `_stats` reduction is only used for debug logging and is compiled when
+    `debug` is set.
+    """
+    scalar = from_dtype(np.dtype(dtype))
+    grid = scalar[:, ::1]
+    _step.compile((grid, grid, grid, grid) + (scalar,) * 6 + (boolean,))
+    if debug:
+        _stats.compile((grid,))
+
+# Floating point types the steppers can integrate in
+SUPPORTED_DTYPES = ("float32", "float64")
+
+# Numba threads per worker process, each mode runs its stencil on this many cores
+THREADS_PER_WORKER = 2
+
+# Threads per block edge for the CUDA stepper
+TPB = 16
+
+# Semaphore shared by the pool workers that limits the concurrent NVENC
+# sessions, set by init_worker
+_nvenc_slots = None
+
+# The field statistics are logged through this module's own logger, so the
+# "log_level" setting does not also let through the debug output of
+# matplotlib, Numba and the other libraries
+stats_logger = logging.getLogger(__name__)
+
+@cuda.jit(device=True)
+def _wrap_index(k, n, periodic):
+    """Map a possibly out-of-range index onto the grid."""
+    if periodic:
+        return k % n
+    return min(max(k, 0), n - 1)
+
+@lru_cache(maxsize=None)
+def make_step_gpu(dtype):
+    """Build the CUDA stepper for grids of `dtype`, with shared tiles of the same type."""
+    scalar = from_dtype(np.dtype(dtype))
+
+    @cuda.jit
+    def step_gpu(u, v, u_new, v_new, a, b, d0, d1, dx2_inv, dt, periodic):
+        """CUDA version of `_step` using a shared-memory tile with a one cell halo."""
+        su = cuda.shared.array((TPB + 2, TPB + 2), dtype=scalar)
+        sv = cuda.shared.array((TPB + 2, TPB + 2), dtype=scalar)
+
+        n, m = u.shape
+        tx = cuda.threadIdx.x
+        ty = cuda.threadIdx.y
+        j, i = cuda.grid(2)
+
+        # Threads outside the grid still load (wrapped) values so that the halo of
+        # partially filled blocks is correct and every thread reaches syncthreads
+        i_c = _wrap_index(i, n, periodic)
+        j_c = _wrap_index(j, m, periodic)
+        su[ty + 1, tx + 1] = u[i_c, j_c]
+        sv[ty + 1, tx + 1] = v[i_c, j_c]
+
+        if tx == 0:
+            j_left = _wrap_index(j - 1, m, periodic)
+            su[ty + 1, 0] = u[i_c, j_left]
+            sv[ty + 1, 0] = v[i_c, j_left]
+        if tx == TPB - 1:
+            j_right = _wrap_index(j + 1, m, periodic)
+            su[ty + 1, TPB + 1] = u[i_c, j_right]
+            sv[ty + 1, TPB + 1] = v[i_c, j_right]
+        if ty == 0:
+            i_up = _wrap_index(i - 1, n, periodic)
+            su[0, tx + 1] = u[i_up, j_c]
+            sv[0, tx + 1] = v[i_up, j_c]
+        if ty == TPB - 1:
+            i_down = _wrap_index(i + 1, n, periodic)
+            su[TPB + 1, tx + 1] = u[i_down, j_c]
+            sv[TPB + 1, tx + 1] = v[i_down, j_c]
+
+        cuda.syncthreads()
+
+        if i >= n or j >= m:
+            return
+
+        u_c = su[ty + 1, tx + 1]
+        v_c = sv[ty + 1, tx + 1]
+        lap_u = ((su[ty + 2, tx + 1] - u_c) + (su[ty, tx + 1] - u_c) + (su[ty + 1, tx + 2] - u_c) + (su[ty + 1, tx] - u_c)) * dx2_inv
+        lap_v = ((sv[ty + 2, tx + 1] - v_c) + (sv[ty, tx + 1] - v_c) + (sv[ty + 1, tx + 2] - v_c) + (sv[ty + 1, tx] - v_c)) * dx2_inv
+        uuv = u_c * u_c * v_c
+
+        u_new[i, j] = u_c + dt * (d0 * lap_u + a - b * u_c - u_c + uuv)
+        v_new[i, j] = v_c + dt * (d1 * lap_v + b * u_c - uuv)
+
+    return step_gpu
+
+def _integrate_cpu(u, v, a, b, d0, d1, dx2_inv, dt, n_steps, frame_every, periodic):
+    """Run the time loop with the Numba CPU stepper, yielding every sampled step."""
+    u_new = np.empty_like(u)
+    v_new = np.empty_like(v)
+
+    yield 0, u, v
+
+    for step in range(1, n_steps + 1):
+        _step(u, v, u_new, v_new, a, b, d0, d1, dx2_inv, dt, periodic)
+        u, u_new = u_new, u
+        v, v_new = v_new, v
+
+        if step % frame_every == 0:
+            yield step, u, v
+
+def _integrate_gpu(u, v, a, b, d0, d1, dx2_inv, dt, n_steps, frame_every, periodic):
+    """Run the time loop on the GPU, copying the state back only for sampled steps."""
+    d_u = cuda.to_device(np.ascontiguousarray(u))
+    d_v = cuda.to_device(np.ascontiguousarray(v))
+    d_u_new = cuda.device_array_like(d_u)
+    d_v_new = cuda.device_array_like(d_v)
+
+    pinned_u = cuda.pinned_array(u.shape, dtype=u.dtype)
+    pinned_v = cuda.pinned_array(v.shape, dtype=v.dtype)
+
+    n, m = u.shape
+    threads = (TPB, TPB)
+    blocks = ((m + TPB - 1) // TPB, (n + TPB - 1) // TPB)
+    params = (a, b, d0, d1, dx2_inv, dt)
+    step_gpu = make_step_gpu(u.dtype)
+
+    yield 0, u, v
+
+    for step in range(1, n_steps + 1):
+        step_gpu[blocks, threads](d_u, d_v, d_u_new, d_v_new, *params, periodic)
+        d_u, d_u_new = d_u_new, d_u
+        d_v, d_v_new = d_v_new, d_v
+
+        if step % frame_every == 0:
+            d_u.copy_to_host(pinned_u)
+            d_v.copy_to_host(pinned_v)
+            yield step, pinned_u, pinned_v
+
+def _integrate_spectral(u, v, a, b, d0, d1, dx, dt, n_steps, frame_every):
+    """Run the time loop with a spectral exponential Euler scheme (periodic grids only).
+
+    Diffusion is solved exactly in Fourier space and the reaction terms are
+    stepped explicitly, so the time step is no longer limited by the
+    diffusion stability bound dt < dx^2 / (4 * d).
+    """
+    n, m = u.shape
+    k_y = 2 * np.pi * scipy.fft.fftfreq(n, d=dx)
+    k_x = 2 * np.pi * scipy.fft.rfftfreq(m, d=dx)
+    k_squared = k_y[:, None] ** 2 + k_x[None, :] ** 2
+
+    decay_u = np.exp(-d0 * k_squared * dt).astype(u.dtype)
+    decay_v = np.exp(-d1 * k_squared * dt).astype(v.dtype)
+
+    # Use this process' share of the cores rather than all of them
+    workers = get_num_threads()
+
+    yield 0, u, v
+
+    for step in range(1, n_steps + 1):
+        uuv = u * u * v
+        u_hat = scipy.fft.rfft2(u + dt * (a - b * u - u + uuv), workers=workers)
+        v_hat = scipy.fft.rfft2(v + dt * (b * u - uuv), workers=workers)
+        u = scipy.fft.irfft2(decay_u * u_hat, s=(n, m), workers=workers)
+        v = scipy.fft.irfft2(decay_v * v_hat, s=(n, m), workers=workers)
+
+        if step % frame_every == 0:
+            yield step, u, v
+
+def integrate(u, v, a, b, d0, d1, dx, dt, t_max, interval, periodic, spectral=False):
+    """Integrate the Brusselator, yielding `(time, (u, v))` every `interval`.
+
+    The yielded arrays are the integrator's own buffers and are overwritten
+    once the generator resumes, so only the current frame is ever held in
+    memory. The grids are integrated in the dtype of `u` and `v`. Periodic
+    grids use the spectral scheme if `spectral` is set. Otherwise the grids
+    are stepped on the GPU when CUDA is available and on the CPU if not.
+    """
+    n_steps = int(round(t_max / dt))
+    frame_every = max(1, int(round(interval / dt)))
+    time_step = dt
+
+    # Cast the parameters to the grid dtype so the stepper does not upcast
+    a, b, d0, d1, dt = (u.dtype.type(x) for x in (a, b, d0, d1, dt))
+    dx2_inv = u.dtype.type(1.0 / (dx * dx))
+
+    if periodic and spectral:
+        logging.info("Periodic grid, integrating with the spectral scheme")
+        steps = _integrate_spectral(u, v, a, b, d0, d1, dx, dt, n_steps, frame_every)
+    elif cuda.is_available():
+        logging.info("CUDA device found, integrating on the GPU")
+        steps = _integrate_gpu(u, v, a, b, d0, d1, dx2_inv, dt, n_steps, frame_every, periodic)
+    else:
+        steps = _integrate_cpu(u, v, a, b, d0, d1, dx2_inv, dt, n_steps, frame_every, periodic)
+
+    for step, u_frame, v_frame in steps:
+        yield step * time_step, (u_frame, v_frame)
+
+def setup_logging(render_dir, level="INFO"):
+    """Set up logging to file and return the file handler."""
     log_file = os.path.join(render_dir, 'processing.log')
 
-    # Create a logger object
+    # Create a logger object, only the statistics logger goes below INFO
+    stats_logger.setLevel(level)
     logger = logging.getLogger()
-    logger.setLevel(logging.INFO)
+    logger.setLevel(max(stats_logger.level, logging.INFO))
 
     # Clear any existing handlers to prevent duplication
     if logger.hasHandlers():
@@ -21,7 +284,7 @@ def setup_logging(render_dir):
 
     # Create handlers
     file_handler = logging.FileHandler(log_file)
-    file_handler.setLevel(logging.INFO)
+    file_handler.setLevel(level)
 
     # Create formatter
     file_formatter = logging.Formatter('%(asctime)s - %(message)s')
@@ -32,6 +295,23 @@ def setup_logging(render_dir):
     # Add handler to logger
     logger.addHandler(file_handler)
 
+    return file_handler
+
+def init_worker(log_queue, level="INFO", nvenc_slots=None):
+    """Set up a pool worker: send its log records to the main process and keep OpenCV to its thread share."""
+    global _nvenc_slots
+    _nvenc_slots = nvenc_slots
+
+    stats_logger.setLevel(level)
+    logger = logging.getLogger()
+    logger.setLevel(max(stats_logger.level, logging.INFO))
+    logger.handlers.clear()
+
+    # The main process writes the records, so the workers never share the file
+    logger.addHandler(QueueHandler(log_queue))
+
+    cv2.setNumThreads(THREADS_PER_WORKER)
+
 def write_settings_to_file(settings, render_dir):
     """Write settings to a text file."""
     settings_path = os.path.join(render_dir, 'settings.txt')
@@ -39,54 +319,255 @@ def write_settings_to_file(settings, render_dir):
         f.write("Settings:\n")
         json.dump(settings, f, indent=4)
 
-def check_for_invalid_values(state_data, title, time_point):
-    """Check for invalid values in the state data."""
-    if np.isnan(state_data).any() or np.isinf(state_data).any():
+def log_field_stats(state, title, time_point):
+    """Log min, max, mean and standard deviation of both fields at debug level and return them."""
+    stats = [_stats(field) for field in state]
+    for name, field_stats in zip(("u", "v"), stats):
+        stats_logger.debug("Mode %s, t = %s, %s: min %.4g, max %.4g, mean %.4g, std %.4g", title, time_point, name, *field_stats)
+    return stats
+
+def check_for_invalid_values(state_data, title, time_point, stats=None):
+    """Check for invalid values in the state data.
+
+    If the statistics from `log_field_stats` are given, their means are checked
+    instead of scanning the fields again, any NaN or inf makes the mean non-finite.
+    """
+    if stats is not None:
+        valid = all(np.isfinite(field_stats[2]) for field_stats in stats)
+    else:
+        valid = all(np.isfinite(field).all() for field in state_data)
+
+    if not valid:
         logging.error(f"Invalid values encountered in mode {title} at time {time_point}.")
         return True
     return False
 
-def process_frame(frame_data):
-    try:
-        frame_idx, state, title, render_dir, circular_mask, settings, RADIUS, description, a, b, d0, d1 = frame_data
+def create_figure(title, description, settings, RADIUS, a, b, d0, d1):
+    """Build the figure of a mode once, the frames only swap the composited image.
 
-        frames_dir = os.path.join(render_dir, f'frames_{title.replace(" ", "_").lower()}')
-        os.makedirs(frames_dir, exist_ok=True)
-        
-        fig, ax = plt.subplots(figsize=(8, 8))
+    Everything except the image and the parameter box on top of it is drawn
+    once and cached as the blitting background.
+    """
+    dpi = settings.get("frame_dpi", 100)
+    fig, ax = plt.subplots(figsize=(8, 8), dpi=dpi)
+
+    empty = np.full((settings["resolution"], settings["resolution"], 3), 255, dtype=np.uint8)
+    image = ax.imshow(empty, extent=[-RADIUS, RADIUS, -RADIUS, RADIUS], animated=True)
 
-        u_data = np.ma.masked_where(~circular_mask, state[0].data)
-        v_data = np.ma.masked_where(~circular_mask, state[1].data)
+    ax.set_title(title, fontweight='bold')
+    ax.set_xlabel('x')
+    ax.set_ylabel('y')
 
-        u_plot = ax.imshow(u_data, cmap=settings["u_color"], alpha=0.6, vmin=settings["color_vmin"], vmax=settings["color_vmax"], extent=[-RADIUS, RADIUS, -RADIUS, RADIUS])
+    params_text = f'a = {a}\nb = {b}\nd0 = {d0}\nd1 = {d1}'
+    params_box = ax.text(-RADIUS + 0.05, -RADIUS + 0.05, params_text, ha='left', va='bottom',
+                         bbox=dict(facecolor='white', alpha=0.5, edgecolor='black'), animated=True)
 
-        v_plot = ax.imshow(v_data, cmap=settings["v_color"], alpha=0.6, vmin=settings["color_vmin"], vmax=settings["color_vmax"], extent=[-RADIUS, RADIUS, -RADIUS, RADIUS])
+    fig.text(0.5, 0.06, description, ha="center", fontsize=10, wrap=True, bbox=dict(facecolor='white', alpha=0.5, edgecolor='black'))
 
-        cbar_u = plt.colorbar(u_plot, ax=ax, fraction=0.046, pad=0.12)
-        cbar_u.ax.set_ylabel('Compound X', labelpad=10)
+    # The layout never changes, so compute the tight crop (with savefig's default
+    # 0.1 inch padding) once instead of on every frame
+    fig.canvas.draw()
+    bbox = fig.get_tightbbox(fig.canvas.get_renderer()).padded(0.1)
+    width, height = fig.canvas.get_width_height()
+    crop = (slice(max(int(height - bbox.y1 * dpi), 0), min(int(height - bbox.y0 * dpi), height)),
+            slice(max(int(bbox.x0 * dpi), 0), min(int(bbox.x1 * dpi), width)))
 
-        cbar_v = plt.colorbar(v_plot, ax=ax, fraction=0.046, pad=0.22)
-        cbar_v.ax.set_ylabel('Compound Y', labelpad=10)
+    background = fig.canvas.copy_from_bbox(ax.bbox)
 
-        plt.title(title, fontweight='bold')
-        ax.set_xlabel('x')
-        ax.set_ylabel('y')
+    colorbars = create_colorbars(settings, ax, crop, dpi)
 
-        params_text = f'a = {a}\nb = {b}\nd0 = {d0}\nd1 = {d1}'
-        ax.text(-RADIUS + 0.05, -RADIUS + 0.05, params_text, ha='left', va='bottom',
-                bbox=dict(facecolor='white', alpha=0.5, edgecolor='black'))
+    return fig, ax, image, params_box, background, crop, colorbars
 
-        plt.figtext(0.5, 0.06, description, ha="center", fontsize=10, wrap=True, bbox=dict(facecolor='white', alpha=0.5, edgecolor='black'))
+def create_colorbars(settings, ax, crop, dpi):
+    """Render both colorbars once into a BGR strip that is appended to every frame.
 
-        frame_path = os.path.join(frames_dir, f'frame_{frame_idx:04d}.png')
-        plt.savefig(frame_path, bbox_inches='tight', dpi=150)
-        plt.close(fig)  # Ensure the figure is closed after saving
-        
-        logging.info(f"Frame {frame_idx} saved for mode {title} at {frame_path}")
+    The strip has the height of the cropped frame and the colorbars line up
+    with the axes of the main figure.
+    """
+    frame_height = crop[0].stop - crop[0].start
+    figure_height = ax.figure.canvas.get_width_height()[1]
 
-        return frame_path
+    # Vertical position of the axes within the cropped frame, as figure fractions
+    ax_extent = ax.get_window_extent()
+    crop_bottom = figure_height - crop[0].stop
+    bottom = (ax_extent.y0 - crop_bottom) / frame_height
+    height = ax_extent.height / frame_height
+
+    # Half a pixel extra so the canvas size does not get rounded down
+    fig_cb = plt.figure(figsize=(1.8, (frame_height + 0.5) / dpi), dpi=dpi)
+    norm = matplotlib.colors.Normalize(vmin=settings["color_vmin"], vmax=settings["color_vmax"])
+
+    cax_u = fig_cb.add_axes([0.05, bottom, 0.1, height])
+    cbar_u = fig_cb.colorbar(matplotlib.cm.ScalarMappable(norm=norm, cmap=settings["u_color"]), cax=cax_u, alpha=0.6)
+    cbar_u.ax.set_ylabel('Compound X', labelpad=10)
+
+    cax_v = fig_cb.add_axes([0.55, bottom, 0.1, height])
+    cbar_v = fig_cb.colorbar(matplotlib.cm.ScalarMappable(norm=norm, cmap=settings["v_color"]), cax=cax_v, alpha=0.6)
+    cbar_v.ax.set_ylabel('Compound Y', labelpad=10)
+
+    fig_cb.canvas.draw()
+    colorbars = cv2.cvtColor(np.asarray(fig_cb.canvas.buffer_rgba())[:frame_height], cv2.COLOR_RGBA2BGR)
+    plt.close(fig_cb)
+
+    return colorbars
+
+def create_compositor(settings, circular_mask):
+    """Precompute what is needed to turn a state into an RGB image.
+
+    Returns the colormap lookup tables, the flat indices inside the circular
+    mask and an RGB buffer that already holds the white background.
+    """
+    lut_u = plt.get_cmap(settings["u_color"])(np.linspace(0, 1, 256), bytes=True)[:, :3]
+    lut_v = plt.get_cmap(settings["v_color"])(np.linspace(0, 1, 256), bytes=True)[:, :3]
+
+    inside = np.flatnonzero(circular_mask)
+    rgb = np.full((circular_mask.size, 3), 255, dtype=np.uint8)
+
+    # Matplotlib's Normalize followed by the 256 entry colormap lookup
+    vmin = settings["color_vmin"]
+    scale = 256 / (settings["color_vmax"] - vmin)
+
+    return lut_u, lut_v, inside, rgb, vmin, scale, circular_mask.shape
+
+def composite_state(state, compositor):
+    """Colormap and blend both fields of a state into one RGB image.
+
+    Reproduces the two stacked imshow layers with alpha 0.6 on a white
+    background: 0.6 * v + 0.4 * (0.6 * u + 0.4 * white).
+    """
+    lut_u, lut_v, inside, rgb, vmin, scale, shape = compositor
+
+    u_idx = np.clip((state[0].reshape(-1)[inside] - vmin) * scale, 0, 255).astype(np.uint8)
+    v_idx = np.clip((state[1].reshape(-1)[inside] - vmin) * scale, 0, 255).astype(np.uint8)
+
+    rgb[inside] = cv2.addWeighted(lut_v[v_idx], 0.6, lut_u[u_idx], 0.24, 0.16 * 255)
+
+    return rgb.reshape(shape + (3,))
+
+@lru_cache(maxsize=None)
+def ffmpeg_encoder_available(codec):
+    """Check whether ffmpeg is installed and can actually encode with `codec`."""
+    if shutil.which("ffmpeg") is None:
+        return False
+
+    # Listing the encoders is not enough for NVENC, it also needs a usable GPU
+    probe = subprocess.run(
+        ["ffmpeg", "-hide_banner", "-loglevel", "error", "-f", "lavfi", "-i", "color=size=256x256",
+         "-frames:v", "1", "-c:v", codec, "-f", "null", "-"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return probe.returncode == 0
+
+class FFmpegVideoWriter:
+    """Drop-in for cv2.VideoWriter that pipes frames into an ffmpeg encoder."""
+
+    def __init__(self, video_path, frame_rate, frame_size, codec, nvenc_slot=None):
+        # yuv420p needs even dimensions
+        width, height = frame_size
+        self.width = width - width % 2
+        self.height = height - height % 2
+        self.video_path = video_path
+        self.nvenc_slot = nvenc_slot
+
+        command = [
+            "ffmpeg", "-y", "-hide_banner", "-loglevel", "error",
+            "-f", "rawvideo", "-pix_fmt", "yuv420p", "-s", f"{self.width}x{self.height}", "-r", str(frame_rate),
+            "-i", "-",
+            "-c:v", codec,
+        ]
+        if codec.endswith("_nvenc"):
+            command += ["-preset", "p4", "-tune", "hq"]
+        command += ["-pix_fmt", "yuv420p", video_path]
+
+        self.process = subprocess.Popen(command, stdin=subprocess.PIPE)
+
+    def write(self, frame):
+        # Convert to I420 here so the encoder does not have to
+        frame = frame[:self.height, :self.width]
+        self.process.stdin.write(cv2.cvtColor(frame, cv2.COLOR_BGR2YUV_I420).tobytes())
+
+    def release(self):
+        """Finish the video and return whether ffmpeg encoded it successfully."""
+        try:
+            self.process.stdin.close()
+        except OSError:
+            # ffmpeg already exited, its exit code below tells why
+            pass
+
+        returncode = self.process.wait()
+        if self.nvenc_slot is not None:
+            self.nvenc_slot.release()
+            self.nvenc_slot = None
+
+        if returncode != 0:
+            logging.error(f"ffmpeg exited with code {returncode} while writing {self.video_path}")
+            return False
+        return True
+
+def open_video_writer(video_path, frame_rate, frame_size, codec):
+    """Open an ffmpeg writer for `codec` if it is usable, otherwise fall back to OpenCV's mp4v.
+
+    Consumer GPUs only run a few NVENC sessions at once. A mode that finds all
+    of them taken encodes with libx264 instead.
+    """
+    nvenc_slot = None
+    if codec and codec.endswith("_nvenc") and _nvenc_slots is not None:
+        if _nvenc_slots.acquire(block=False):
+            nvenc_slot = _nvenc_slots
+        else:
+            logging.info(f"All NVENC sessions are in use, encoding {video_path} with libx264")
+            codec = "libx264"
+
+    if codec and ffmpeg_encoder_available(codec):
+        logging.info(f"Encoding {video_path} with ffmpeg {codec}")
+        try:
+            return FFmpegVideoWriter(video_path, frame_rate, frame_size, codec, nvenc_slot)
+        except OSError:
+            if nvenc_slot is not None:
+                nvenc_slot.release()
+            raise
+
+    if nvenc_slot is not None:
+        nvenc_slot.release()
+
+    logging.info(f"Encoder {codec} not available, encoding {video_path} with OpenCV mp4v")
+    return cv2.VideoWriter(video_path, cv2.VideoWriter_fourcc(*'mp4v'), frame_rate, frame_size)
+
+def save_frame(frame, frame_path, frame_idx, title):
+    """Write a rendered frame to disk as PNG, with fast low-effort compression.
+
+    Runs on the PNG writer threads, whose futures are never inspected, so
+    errors are logged here instead of raised.
+    """
+    try:
+        saved = cv2.imwrite(frame_path, frame, [cv2.IMWRITE_PNG_COMPRESSION, 1])
+    except cv2.error as e:
+        logging.error("Error saving frame %d for mode %s to %s: %s", frame_idx, title, frame_path, e)
+        return
+
+    if saved:
+        logging.info("Frame %d saved for mode %s at %s", frame_idx, title, frame_path)
+    else:
+        logging.error("Error saving frame %d for mode %s to %s", frame_idx, title, frame_path)
+
+def process_frame(frame_data):
+    """Render a state to a BGR image."""
+    try:
+        frame_idx, state, title, compositor, figure = frame_data
+        fig, ax, image, params_box, background, crop, colorbars = figure
+
+        image.set_data(composite_state(state, compositor))
+
+        # Only redraw the axes contents on top of the cached background
+        fig.canvas.restore_region(background)
+        ax.draw_artist(image)
+        for spine in ax.spines.values():
+            ax.draw_artist(spine)
+        ax.draw_artist(params_box)
+        fig.canvas.blit(ax.bbox)
+
+        return cv2.hconcat([cv2.cvtColor(np.asarray(fig.canvas.buffer_rgba())[crop], cv2.COLOR_RGBA2BGR), colorbars])
     except Exception as e:
-        logging.error(f"Error processing frame {frame_idx} for mode {title}: {e}")
+        logging.error("Error processing frame %d for mode %s: %s", frame_idx, title, e)
         return None
 
 def process_mode(mode, render_dir, settings):
@@ -100,86 +581,110 @@ def process_mode(mode, render_dir, settings):
 
     logging.info(f"Starting mode {title}")
 
-    # Define the PDE
-    eq = PDE(
-        {
-            "u": f"{d0} * laplace(u) + {a} - ({b} + 1) * u + u**2 * v",
-            "v": f"{d1} * laplace(v) + {b} * u - u**2 * v",
-        }
-    )
-
     # Initialize state with reflective boundary conditions
     RADIUS = 1 / settings["zoom_factor"]
-    grid = CartesianGrid([[-RADIUS, RADIUS], [-RADIUS, RADIUS]], [settings["resolution"], settings["resolution"]], periodic=not settings["fixed_boundary"])
-
-    u = ScalarField(grid, a, label="Field $u$")
-    v = b / a + 0.1 * ScalarField.random_normal(grid, label="Field $v$")
-
-    center = (grid.shape[0] // 2, grid.shape[1] // 2)
-    Y, X = np.ogrid[:grid.shape[0], :grid.shape[1]]
-    dist_from_center = np.sqrt((X - center[1]) ** 2 + (Y - center[0]) ** 2)
-    circular_mask = dist_from_center <= (RADIUS * (settings["resolution"] / (2 * RADIUS)))
-
+    N = settings["resolution"]
+    dx = 2 * RADIUS / N
+
+    dtype = np.dtype(settings.get("dtype", "float64"))
+    u = np.full((N, N), a, dtype=dtype)
+    v = (b / a + 0.1 * np.random.standard_normal((N, N))).astype(dtype, copy=False)
+
+    # The circle spans the whole grid, i.e. its radius is N / 2 pixels. Compare
+    # squared integer distances instead of taking a float square root
+    center = (N // 2, N // 2)
+    Y, X = np.ogrid[:N, :N]
+    Y = Y.astype(np.int32)
+    X = X.astype(np.int32)
+    circular_mask = (X - center[1]) ** 2 + (Y - center[0]) ** 2 <= (N * N) // 4
+
+    # Zero the grid outside the circle by multiplying with the mask, which
+    # avoids the inverted mask and the boolean indexing
     if settings["fixed_boundary"]:
-        u.data[~circular_mask] = 0
-        v.data[~circular_mask] = 0
-
-    state = FieldCollection([u, v])
+        u *= circular_mask
+        v *= circular_mask
+
+    figure = create_figure(title, description, settings, RADIUS, a, b, d0, d1)
+    compositor = create_compositor(settings, circular_mask)
+
+    # PNG copies of the frames are optional. They are written by the worker's
+    # share of threads (OpenCV releases the GIL while encoding) so the PNG
+    # compression overlaps with the integration, rendering and video encoding
+    frames_dir = None
+    png_writer = None
+    if settings.get("keep_png", False):
+        frames_dir = os.path.join(render_dir, f'frames_{title.replace(" ", "_").lower()}')
+        os.makedirs(frames_dir, exist_ok=True)
+        png_writer = ThreadPoolExecutor(max_workers=THREADS_PER_WORKER)
 
-    storage = MemoryStorage()
+    # Every sampled state is rendered and handed to the encoder before the
+    # integration continues, the writer is opened once the frame size is known.
+    # The video is encoded under a temporary name and only renamed once it is
+    # complete, so a failed mode does not leave a truncated video behind
+    video_path = os.path.join(render_dir, filename)
+    root, extension = os.path.splitext(video_path)
+    partial_path = f"{root}.part{extension}"
+    out = None
+    debug = stats_logger.isEnabledFor(logging.DEBUG)
+    nan_check_every = max(1, settings.get("nan_check_every", 16))
 
     try:
         logging.info(f"Solving PDE for mode {title}")
-        sol = eq.solve(state, t_range=settings["t_max"], dt=settings["dt"], tracker=storage.tracker(interval=1))
+        states = integrate(u, v, a, b, d0, d1, dx, settings["dt"], settings["t_max"], interval=1, periodic=not settings["fixed_boundary"], spectral=settings.get("spectral", False))
+        for frame_idx, (time_point, state) in enumerate(states):
+            # A blow-up does not recover, so checking every few frames is
+            # enough for the video, which is deleted if a later check fails.
+            # PNGs are kept as soon as they are written, so those frames are
+            # always checked first. The debug statistics cover every frame for free
+            stats = log_field_stats(state, title, time_point) if debug else None
+            if stats is not None or png_writer is not None or frame_idx % nan_check_every == 0:
+                if check_for_invalid_values(state, title, time_point, stats):
+                    raise ValueError(f"Invalid values encountered in mode {title} at time {time_point}.")
+            logging.info("Computed plot for t = %s", time_point)
+
+            frame = process_frame((frame_idx, state, title, compositor, figure))
+            if frame is None:
+                continue
+
+            if png_writer is not None:
+                frame_path = os.path.join(frames_dir, f'frame_{frame_idx:04d}.png')
+                png_writer.submit(save_frame, frame, frame_path, frame_idx, title)
+
+            if out is None:
+                height, width = frame.shape[:2]
+                out = open_video_writer(partial_path, settings["frame_rate"], (width, height), settings.get("video_codec", "h264_nvenc"))
+
+            out.write(frame)
         logging.info(f"Finished solving PDE for mode {title}")
-        for time_point, state_data in storage.items():
-            if check_for_invalid_values(state_data.data, title, time_point):
-                raise ValueError(f"Invalid values encountered in mode {title} at time {time_point}.")
-            logging.info(f"Computed plot for t = {time_point}")
-    except (RuntimeWarning, ValueError) as e:
+    except (RuntimeWarning, ValueError, OSError) as e:
+        # OSError covers an ffmpeg process that exited while frames were piped in
         logging.error(f"Warning or error encountered in mode {title}: {e}")
-        return []
-
-    storage_dict = list(storage.items())
-
-    frame_data_list = [
-        (frame_idx, state, title, render_dir, circular_mask, settings, RADIUS, description, a, b, d0, d1)
-        for frame_idx, (time, state) in enumerate(storage_dict)
-    ]
-
-    frame_paths = []
-    for frame_data in frame_data_list:
-        frame_path = process_frame(frame_data)
-        if frame_path:
-            frame_paths.append(frame_path)
+        video_path = None
+    finally:
+        plt.close(figure[0])
+        # Only the ffmpeg writer reports a status, cv2.VideoWriter returns None
+        if out is not None and out.release() is False:
+            video_path = None
+        if png_writer is not None:
+            png_writer.shutdown(wait=True)
 
     logging.info(f"Finished frame processing for mode {title}")
 
-    video_path = os.path.join(render_dir, filename)
-
-    if not frame_paths:
+    if out is None:
         logging.error(f"No frames processed for mode {title}. Skipping video creation.")
-        return []
-
-    first_frame = cv2.imread(frame_paths[0])
-    if first_frame is None:
-        raise ValueError("First frame not found. Check if the frames are being saved correctly.")
-    height, width, layers = first_frame.shape
-    frame_size = (width, height)
+        video_path = None
 
-    out = cv2.VideoWriter(video_path, cv2.VideoWriter_fourcc(*'mp4v'), settings["frame_rate"], frame_size)
+    if video_path:
+        os.replace(partial_path, video_path)
+        logging.info(f"Video saved to {video_path}")
+    elif os.path.exists(partial_path):
+        os.remove(partial_path)
 
-    for frame_path in frame_paths:
-        frame = cv2.imread(frame_path)
-        if frame is None:
-            logging.warning(f"Error reading frame {frame_path}. Skipping.")
-            continue
-        out.write(frame)
+    return video_path
 
-    out.release()
-    logging.info(f"Video saved to {video_path}")
-
-    return frame_paths
+def process_mode_wrap(args):
+    """Unpack the arguments of `process_mode` for `Pool.imap_unordered`."""
+    return process_mode(*args)
 
 def main():
     # Load settings from external JSON file
@@ -193,6 +698,10 @@ def main():
     missing_keys = [key for key in required_keys if key not in settings]
     if missing_keys:
         raise KeyError(f"Missing required settings: {', '.join(missing_keys)}")
+
+    # The Numba steppers only support IEEE single and double precision
+    if settings.get("dtype", "float64") not in SUPPORTED_DTYPES:
+        raise ValueError(f"Unsupported dtype {settings['dtype']}, use one of: {', '.join(SUPPORTED_DTYPES)}")
     
     # Extract constants from settings
     RESOLUTION = settings["resolution"]
@@ -217,15 +726,60 @@ def main():
     os.makedirs(render_dir, exist_ok=True)
 
     # Set up logging
-    setup_logging(render_dir)
+    log_level = settings.get("log_level", "INFO")
+    file_handler = setup_logging(render_dir, log_level)
     logging.info("Logging is set up.")
     
     # Save settings to file before starting any processing
     write_settings_to_file(settings, render_dir)
 
-    # Process modes sequentially
-    for mode in settings["modes"]:
-        process_mode(mode, render_dir, settings)
+    # Compile the kernels once before the workers start
+    warm_up_kernels(settings.get("dtype", "float64"), stats_logger.isEnabledFor(logging.DEBUG))
+
+    # Process modes in parallel. With chunksize=1 every worker picks up the next
+    # mode as soon as it is free, so a mode that runs long does not hold up a
+    # batch of others queued behind it
+    modes = settings["modes"]
+    tasks = [(mode, render_dir, settings) for mode in modes]
+
+    # Split the cores between worker processes and the stencil threads inside
+    # them instead of oversubscribing. The variable is read when Numba is
+    # imported, so it has to be set before the workers start
+    os.environ["NUMBA_NUM_THREADS"] = str(min(THREADS_PER_WORKER, cpu_count()))
+
+    # Keep any OpenMP/BLAS backed library in the workers single threaded,
+    # the parallelism comes from the processes and Numba's prange
+    for variable in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[variable] = "1"
+
+    processes = max(1, min(len(modes), cpu_count() // THREADS_PER_WORKER))
+
+    # Start the workers from a clean forkserver process instead of forking this
+    # one with its matplotlib state, spawn where forkserver does not exist
+    start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    context = multiprocessing.get_context(start_method)
+
+    # The workers log through a queue, a listener thread in this process
+    # writes their records to the log file
+    log_queue = context.Queue()
+    log_listener = QueueListener(log_queue, file_handler)
+    log_listener.start()
+
+    # Shared between the workers so no more NVENC sessions are opened than the GPU allows
+    nvenc_slots = context.BoundedSemaphore(max(1, settings.get("nvenc_sessions", 3)))
+
+    try:
+        with context.Pool(processes=processes, initializer=init_worker, initargs=(log_queue, log_level, nvenc_slots)) as pool:
+            for video_path in pool.imap_unordered(process_mode_wrap, tasks, chunksize=1):
+                if video_path:
+                    logging.info(f"Finished {video_path}")
+
+            # Let the workers exit on their own so they flush their log
+            # records, leaving the block would terminate them mid-write
+            pool.close()
+            pool.join()
+    finally:
+        log_listener.stop()
 
 if __name__ == "__main__":
     main()